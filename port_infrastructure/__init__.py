@@ -0,0 +1,3 @@
+"""
+Python helpers shipped alongside the Port.io infrastructure setup script.
+"""
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+"""
+Port.io API Client
+Simple Python client for interacting with Port.io API
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import importlib.util
+import requests
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Tuple, Union
+
+# httpx is optional and only needed for PortClient.bulk_upsert
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# orjson is optional; it serializes straight to bytes and is much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj) -> bytes:
+    """Serialize a request body to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Shared with setup.py (through load/store_cached_token) so a token fetched there is reused here
+TOKEN_CACHE_PATH = Path.home() / '.port_setup_token.json'
+# Refresh tokens this many seconds before Port.io expires them
+TOKEN_REFRESH_MARGIN = 60
+# bulk_upsert batching: entities per gather() batch, requests in flight, 429 attempts
+BULK_CHUNK_SIZE = 50
+BULK_CONCURRENCY = 16
+BULK_MAX_ATTEMPTS = 5
+# Quoted port_* assignments in terraform.tfvars; the quoted value matches setup.py's parser
+_TFVARS_RE = re.compile(r'^\s*(port_\w+)\s*=\s*"((?:[^"\\\n]|\\.)*)"', re.M)
+
+def _credentials_fingerprint(client_id: str, client_secret: str) -> str:
+    return hashlib.sha256(f"{client_id}:{client_secret}".encode()).hexdigest()
+
+def load_cached_token(client_id: str, client_secret: str) -> Optional[Tuple[str, float]]:
+    """Return (token, seconds left) from the on-disk cache if it is still valid for these credentials."""
+    try:
+        with open(TOKEN_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    
+    # The file stores wall-clock expiry so it stays meaningful across processes
+    remaining = cached.get('exp', 0) - time.time()
+    token = cached.get('token')
+    if token and cached.get('client') == _credentials_fingerprint(client_id, client_secret) \
+            and remaining > TOKEN_REFRESH_MARGIN:
+        return token, remaining
+    return None
+
+def store_cached_token(client_id: str, client_secret: str, token: str, expires_in: float):
+    """Persist an access token, readable only by the current user."""
+    payload = {
+        'client': _credentials_fingerprint(client_id, client_secret),
+        'token': token,
+        'exp': time.time() + expires_in
+    }
+    try:
+        fd = os.open(TOKEN_CACHE_PATH, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+    except OSError:
+        pass
+
+class PortClient:
+    def __init__(self, client_id: str = None, client_secret: str = None):
+        self.client_id = client_id or os.getenv('PORT_CLIENT_ID')
+        self.client_secret = client_secret or os.getenv('PORT_CLIENT_SECRET')
+        self.base_url = "https://api.getport.io/v1"
+        self.access_token = None
+        self.token_expiry = 0.0  # time.monotonic() deadline
+        
+        # One pooled session keeps the TLS connection warm across calls
+        self._session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+    
+    def _load_cached_token(self) -> bool:
+        """Load a still-valid token from the on-disk cache."""
+        cached = load_cached_token(self.client_id, self.client_secret)
+        if cached is None:
+            return False
+        
+        # Convert the remaining lifetime to a monotonic deadline
+        self.access_token, remaining = cached
+        self.token_expiry = time.monotonic() + remaining
+        return True
+    
+    def invalidate_token(self):
+        """Drop the cached token so the next request re-authenticates."""
+        self.access_token = None
+        self.token_expiry = 0.0
+        try:
+            TOKEN_CACHE_PATH.unlink()
+        except OSError:
+            pass
+    
+    def get_access_token(self) -> str:
+        """Get access token from Port.io."""
+        if self.access_token and time.monotonic() < self.token_expiry - TOKEN_REFRESH_MARGIN:
+            return self.access_token
+        if self._load_cached_token():
+            return self.access_token
+            
+        response = self._session.post(
+            f"{self.base_url}/auth/access_token",
+            json={
+                "clientId": self.client_id,
+                "clientSecret": self.client_secret
+            }
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        expires_in = data.get("expiresIn", 3600)
+        self.access_token = data["accessToken"]
+        self.token_expiry = time.monotonic() + expires_in
+        store_cached_token(self.client_id, self.client_secret, self.access_token, expires_in)
+        return self.access_token
+    
+    def make_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make authenticated request to Port.io API."""
+        headers = kwargs.pop('headers', {})
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        
+        for attempt in range(2):
+            headers['Authorization'] = f'Bearer {self.get_access_token()}'
+            response = self._session.request(method, url, headers=headers, **kwargs)
+            
+            # A cached token may have been revoked; re-authenticate once
+            if response.status_code == 401 and attempt == 0:
+                self.invalidate_token()
+                continue
+            break
+        
+        response.raise_for_status()
+        return response.json()
+    
+    def get_blueprints(self) -> List[Dict]:
+        """Get all blueprints."""
+        return self.make_request('GET', '/blueprints')['blueprints']
+    
+    def get_entities(self, blueprint: str) -> List[Dict]:
+        """Get entities for a blueprint."""
+        return self.make_request('GET', f'/blueprints/{blueprint}/entities')['entities']
+    
+    def get_integrations(self) -> List[Dict]:
+        """Get all integrations."""
+        return self.make_request('GET', '/integrations')
+    
+    def create_entity(self, blueprint: str, entity_data: Dict) -> Dict:
+        """Create a new entity."""
+        return self.create_entity_raw(blueprint, _dumps(entity_data))
+    
+    def create_entity_raw(self, blueprint: str, entity_bytes: bytes) -> Dict:
+        """Create an entity from an already JSON-encoded body (for bulk imports)."""
+        return self.make_request('POST', f'/blueprints/{blueprint}/entities',
+                                 data=entity_bytes, headers=dict(JSON_HEADERS))
+    
+    def update_entity(self, blueprint: str, entity_id: str, entity_data: Dict) -> Dict:
+        """Update an existing entity."""
+        return self.update_entity_raw(blueprint, entity_id, _dumps(entity_data))
+    
+    def update_entity_raw(self, blueprint: str, entity_id: str, entity_bytes: bytes) -> Dict:
+        """Update an entity from an already JSON-encoded body (for bulk imports)."""
+        return self.make_request('PUT', f'/blueprints/{blueprint}/entities/{entity_id}',
+                                 data=entity_bytes, headers=dict(JSON_HEADERS))
+    
+    def bulk_upsert(self, blueprint: str, entities: List[Dict]) -> List[Union[Dict, Exception]]:
+        """Create or update many entities concurrently (requires httpx).
+        
+        Returns one item per entity, in order: the API response, or the exception
+        that stopped that entity (so one failure doesn't hide the ones that succeeded).
+        """
+        if httpx is None:
+            raise RuntimeError("bulk_upsert requires httpx: pip install httpx")
+        return asyncio.run(self._bulk_upsert(blueprint, entities))
+    
+    async def _bulk_upsert(self, blueprint: str, entities: List[Dict]) -> List[Union[Dict, Exception]]:
+        url = f"{self.base_url}/blueprints/{blueprint}/entities"
+        headers = {**JSON_HEADERS, 'Authorization': f'Bearer {self.get_access_token()}'}
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+        
+        # The client is bound to this event loop, so it lives for one bulk call
+        async with httpx.AsyncClient(
+            http2=importlib.util.find_spec('h2') is not None,
+            limits=httpx.Limits(max_connections=32),
+            timeout=30
+        ) as client:
+            async def upsert(entity: Dict) -> Dict:
+                body = _dumps(entity)
+                async with semaphore:
+                    for _ in range(BULK_MAX_ATTEMPTS):
+                        response = await client.post(url, params={'upsert': 'true'},
+                                                     content=body, headers=headers)
+                        if response.status_code != 429:
+                            break
+                        await asyncio.sleep(_retry_after_seconds(response))
+                    response.raise_for_status()
+                    return response.json()
+            
+            results = []
+            for start in range(0, len(entities), BULK_CHUNK_SIZE):
+                batch = entities[start:start + BULK_CHUNK_SIZE]
+                results.extend(await asyncio.gather(*(upsert(entity) for entity in batch),
+                                                    return_exceptions=True))
+            return results
+
+def _retry_after_seconds(response) -> float:
+    """Seconds to wait on a 429, from Retry-After when it is given in seconds."""
+    try:
+        return max(float(response.headers.get('Retry-After', 1)), 0.0)
+    except ValueError:
+        return 1.0
+
+def load_tfvars_credentials(path: str = 'terraform.tfvars') -> Dict[str, str]:
+    """Read port_* values from a tfvars file in a single regex pass.
+    
+    Raises FileNotFoundError when the file does not exist.
+    """
+    return dict(_TFVARS_RE.findall(Path(path).read_text()))
+
+def _print_json(obj, compact: bool = False):
+    """Stream obj to stdout as JSON without building the whole string first."""
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE if compact else orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+        # Flush pending text output so the raw bytes land after it
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(obj, option=option))
+        sys.stdout.buffer.flush()
+        return
+    
+    if compact:
+        json.dump(obj, sys.stdout, separators=(',', ':'))
+    else:
+        json.dump(obj, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point: python3 port_client.py {blueprints,entities,integrations}."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Port.io API Client')
+    parser.add_argument('command', choices=['blueprints', 'entities', 'integrations'])
+    parser.add_argument('--blueprint', help='Blueprint name for entities command')
+    parser.add_argument('--compact', action='store_true', help='Print JSON without indentation')
+    args = parser.parse_args(argv)
+    
+    # Load credentials from terraform.tfvars if available
+    try:
+        creds = load_tfvars_credentials()
+        client_id = creds.get('port_client_id')
+        client_secret = creds.get('port_client_secret')
+    except FileNotFoundError:
+        print("terraform.tfvars not found, using environment variables")
+        client_id = os.getenv('PORT_CLIENT_ID')
+        client_secret = os.getenv('PORT_CLIENT_SECRET')
+    
+    client = PortClient(client_id, client_secret)
+    
+    try:
+        if args.command == 'blueprints':
+            blueprints = client.get_blueprints()
+            _print_json(blueprints, args.compact)
+        elif args.command == 'entities':
+            if not args.blueprint:
+                print("--blueprint required for entities command")
+                sys.exit(1)
+            entities = client.get_entities(args.blueprint)
+            _print_json(entities, args.compact)
+        elif args.command == 'integrations':
+            integrations = client.get_integrations()
+            _print_json(integrations, args.compact)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()